@@ -1,57 +1,346 @@
 import boto3
-from boto3.dynamodb.conditions import Key, Attr
-from flask import Flask, request, jsonify
+from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from flask import Flask, request, Response, stream_with_context
 from flask_cors import CORS
+import functools
 import hashlib
+import hmac
+import os
+import queue
+import random
+import re
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
+from decimal import Decimal
 import json
 import logging
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib JSON still works
+    orjson = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app)
+
+# CORS only on the routes the browser frontend actually calls; /health
+# stays middleware-free for load-balancer probes. max_age lets browsers
+# cache preflight responses for a day instead of re-preflighting each call.
+CORS(app,
+     resources={r"/users*": {"origins": "*"},
+                r"/stats": {"origins": "*"},
+                r"/setup": {"origins": "*"}},
+     max_age=86400,
+     send_wildcard=False)
 
 # DynamoDB configuration
 AWS_REGION = 'us-east-1'  # Change as needed
 TABLE_NAME = 'hackathon_users'
 
-# Initialize DynamoDB
-dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
-dynamodb_client = boto3.client('dynamodb', region_name=AWS_REGION)
+# Number of write shards for the status GSI: every user shares a handful of
+# status values, so without sharding all of those index writes land on one
+# partition and hit the per-partition WCU ceiling
+STATUS_SHARDS = 10
+
+# Emails are normalized exactly once, at the HTTP boundary; everything
+# below the routes (storage, GSI queries, cache keys) trusts the
+# canonical lowercase form instead of re-lowercasing per call
+EMAIL_RE = re.compile(r'^[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}$')
+
+def normalize_email(email):
+    """Canonical lowercase email, or None if it doesn't look like one"""
+    if not email:
+        return None
+    email = email.strip().lower()
+    return email if EMAIL_RE.match(email) else None
+
+# scrypt work factors for password hashing (memory-hard; ~16MB per hash)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# Second-granularity cached ISO timestamp: hot paths stamp writes with
+# this instead of paying datetime.utcnow().isoformat() on every call.
+# Audit-critical fields (created_at on insert) keep the precise call.
+_now_cache = (0, '')
+
+def _now_iso():
+    global _now_cache
+    second = int(time.time())
+    cached_second, cached_iso = _now_cache
+    if second != cached_second:
+        cached_iso = datetime.utcnow().isoformat()
+        _now_cache = (second, cached_iso)
+    return cached_iso
+
+# DynamoDB returns every number as decimal.Decimal, which is far slower
+# than native ints through arithmetic and serialization; convert once at
+# the read boundary so nothing downstream carries Decimals around
+def _to_native(value):
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    if isinstance(value, dict):
+        return {k: _to_native(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_native(v) for v in value]
+    return value
+
+# Handwritten deserializer for low-level (already-typed) items covering
+# the attribute types this table stores; numbers go straight to int/float
+# instead of through TypeDeserializer's Decimal wrapping
+_TYPE_DESERIALIZER = TypeDeserializer()
+
+def _deserialize_value(typed):
+    tag, value = next(iter(typed.items()))
+    if tag == 'S':
+        return value
+    if tag == 'N':
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    if tag == 'BOOL':
+        return value
+    if tag == 'NULL':
+        return None
+    if tag == 'M':
+        return {k: _deserialize_value(v) for k, v in value.items()}
+    if tag == 'L':
+        return [_deserialize_value(v) for v in value]
+    return _to_native(_TYPE_DESERIALIZER.deserialize(typed))  # rare types
+
+def _deserialize_item(item):
+    return {key: _deserialize_value(value) for key, value in item.items()}
+
+def _shard(key, n=STATUS_SHARDS):
+    """Stable shard index for a key, e.g. 'active' -> 3"""
+    digest = int(hashlib.blake2b(key.encode('utf-8'), digest_size=4).hexdigest(), 16)
+    return digest % n
+
+# Condition/key expression objects are stateless once built, so hoist the
+# constant ones instead of rebuilding (and re-serializing) them per call
+EMAIL_NOT_EXISTS = Attr('email').not_exists()
+USER_ID_EXISTS = Attr('user_id').exists()
+ACTIVE_TRUE = Attr('active').eq(True)
+
+@functools.lru_cache(maxsize=1024)
+def _update_template(keys):
+    """Precompiled UpdateExpression and attribute-name map for a field
+    set; PUT /users/<id> tends to send the same few fields every time,
+    so only the values dict varies per call"""
+    assignments = ", ".join(f"#{key} = :{key}" for key in keys)
+    return "SET " + assignments, {f"#{key}": key for key in keys}
+
+# Attributes exposed on public read paths; projecting these server-side
+# keeps password_hash bytes from ever leaving DynamoDB on reads.
+# 'status' is a DynamoDB reserved word, hence the #st alias.
+PUBLIC_FIELDS = ("user_id, username, email, #st, created_at, updated_at, "
+                 "verified, active, login_count, last_login, profile_data")
+PUBLIC_FIELD_NAMES = {'#st': 'status'}
+
+# Error codes worth retrying client-side; anything else (including
+# conditional check failures) propagates immediately
+THROTTLE_ERROR_CODES = ('ProvisionedThroughputExceededException',
+                        'ThrottlingException',
+                        'RequestLimitExceeded')
+
+def retry_on_throttle(base=0.05, cap=2.0, max_tries=6):
+    """Retry throttled DynamoDB calls with decorrelated jittered backoff"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            sleep = base
+            for attempt in range(1, max_tries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except ClientError as e:
+                    code = e.response.get('Error', {}).get('Code')
+                    if code not in THROTTLE_ERROR_CODES or attempt == max_tries:
+                        raise
+                    sleep = min(cap, random.uniform(base, sleep * 3))
+                    logger.warning(
+                        f"Throttled ({code}); retry {attempt}/{max_tries} "
+                        f"in {sleep:.2f}s")
+                    time.sleep(sleep)
+        return wrapper
+    return decorator
+
+# Shared client config: a pool big enough that concurrent requests don't
+# queue for a connection slot (botocore defaults to 10), TCP keepalive so
+# idle connections aren't torn down and re-handshaked, adaptive retries so
+# throttling backs off client-side, and tight timeouts to fail fast
+_BOTO_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    connect_timeout=1.0,
+    read_timeout=3.0
+)
+
+# Lazily initialized, shared per process so every caller reuses the same
+# underlying connection pool instead of paying session setup per call
+@functools.lru_cache(maxsize=1)
+def _ddb_resource():
+    return boto3.resource('dynamodb', region_name=AWS_REGION, config=_BOTO_CONFIG)
+
+@functools.lru_cache(maxsize=1)
+def _ddb_client():
+    return boto3.client('dynamodb', region_name=AWS_REGION, config=_BOTO_CONFIG)
+
+class TTLCache:
+    """Small thread-safe cache with TTL, idle expiry and LRU eviction"""
+    def __init__(self, maxsize=10000, ttl=3600, idle_ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.idle_ttl = idle_ttl if idle_ttl is not None else ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, created_at, last_used)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created_at, last_used = entry
+            if now - created_at > self.ttl or now - last_used > self.idle_ttl:
+                del self._entries[key]
+                return None
+            self._entries[key] = (value, created_at, now)
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, now, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry is not None else default
+
+    def pop_matching(self, predicate):
+        """Remove all entries whose key matches the predicate"""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class HotPartitionDetector:
+    """Tracks per-partition-key write rates and logs suspected hot keys"""
+    def __init__(self, window=60, threshold=500):
+        self.window = window
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._writes = {}  # pk -> timestamps within the window
+        self._last_sweep = 0.0
+
+    def record(self, pk):
+        now = time.monotonic()
+        cutoff = now - self.window
+        with self._lock:
+            stamps = self._writes.setdefault(pk, [])
+            stamps.append(now)
+            while stamps and stamps[0] < cutoff:
+                stamps.pop(0)
+            if len(stamps) > self.threshold:
+                logger.warning(
+                    f"Hot partition suspected: {pk} saw {len(stamps)} writes "
+                    f"in the last {self.window}s")
+
+            # Sweep keys that went quiet so the map doesn't grow with
+            # every distinct pk ever recorded
+            if now - self._last_sweep > self.window:
+                for key in [k for k, s in self._writes.items()
+                            if not s or s[-1] < cutoff]:
+                    del self._writes[key]
+                self._last_sweep = now
 
 class DynamoDBManager:
     def __init__(self, table_name):
         self.table_name = table_name
         self.table = None
+        # Verified credentials cache: (email, password hash) -> user doc
+        # (without password hash). 3h TTL, 1h idle expiry.
+        self._auth_cache = TTLCache(maxsize=10000, ttl=3 * 3600, idle_ttl=3600)
+        # Profile read cache (public user doc by user_id) plus an
+        # email -> user_id map so email-keyed writes can invalidate it
+        self._user_cache = TTLCache(maxsize=50000, ttl=300)
+        self._email_to_uid = TTLCache(maxsize=50000, ttl=300)
+        self._hot_writes = HotPartitionDetector()
+        self._last_health = None  # (monotonic ts, ok) from the last probe
         self._initialize_table()
+        # Login-stat writes tolerate bounded staleness, so they're flushed
+        # off the request path by a background worker; the thread starts
+        # lazily so merely importing this module (CLI tools, gevent
+        # workers patching at boot) never spawns an OS thread
+        self._login_queue = queue.Queue()
+        self._login_worker_started = False
+        self._login_worker_lock = threading.Lock()
     
     def _initialize_table(self):
-        """Initialize table connection"""
+        """Initialize table connection (no network call; see ping())"""
+        self.table = _ddb_resource().Table(self.table_name)
+
+    @retry_on_throttle()
+    def _put_item(self, **kwargs):
+        return self.table.put_item(**kwargs)
+
+    @retry_on_throttle()
+    def _update_item(self, **kwargs):
+        return self.table.update_item(**kwargs)
+
+    # Load balancers probe /health every few seconds; cache the result so
+    # they don't turn into a stream of DescribeTable calls
+    HEALTH_CACHE_SECONDS = 30
+
+    def ping(self):
+        """Probe that the table actually exists and is reachable (cached)"""
+        now = time.monotonic()
+        if self._last_health and now - self._last_health[0] < self.HEALTH_CACHE_SECONDS:
+            return self._last_health[1]
+
         try:
-            self.table = dynamodb.Table(self.table_name)
-            # Test table exists
             self.table.load()
-            logger.info(f"Connected to existing table: {self.table_name}")
+            ok = True
         except Exception as e:
-            logger.warning(f"Table doesn't exist: {e}")
-            self.table = None
+            logger.warning(f"Table not reachable: {e}")
+            ok = False
+
+        self._last_health = (now, ok)
+        return ok
     
     def create_table(self):
         """Create the DynamoDB table with optimal configuration"""
         try:
             # Check if table already exists
-            existing_tables = dynamodb_client.list_tables()['TableNames']
+            existing_tables = _ddb_client().list_tables()['TableNames']
             if self.table_name in existing_tables:
                 logger.info(f"Table {self.table_name} already exists")
-                self.table = dynamodb.Table(self.table_name)
+                self.table = _ddb_resource().Table(self.table_name)
+                # Tables created before the status GSI existed need the
+                # index added and their rows stamped with a status key
+                self.ensure_status_index()
                 return True
             
             # Create new table
-            table = dynamodb.create_table(
+            table = _ddb_resource().create_table(
                 TableName=self.table_name,
                 KeySchema=[
                     {
@@ -67,6 +356,14 @@ class DynamoDBManager:
                     {
                         'AttributeName': 'email',
                         'AttributeType': 'S'
+                    },
+                    {
+                        'AttributeName': 'status',
+                        'AttributeType': 'S'
+                    },
+                    {
+                        'AttributeName': 'created_at',
+                        'AttributeType': 'S'
                     }
                 ],
                 GlobalSecondaryIndexes=[
@@ -82,6 +379,23 @@ class DynamoDBManager:
                             'ProjectionType': 'ALL'
                         },
                         'BillingMode': 'PAY_PER_REQUEST'
+                    },
+                    {
+                        'IndexName': 'status-index',
+                        'KeySchema': [
+                            {
+                                'AttributeName': 'status',
+                                'KeyType': 'HASH'
+                            },
+                            {
+                                'AttributeName': 'created_at',
+                                'KeyType': 'RANGE'
+                            }
+                        ],
+                        'Projection': {
+                            'ProjectionType': 'ALL'
+                        },
+                        'BillingMode': 'PAY_PER_REQUEST'
                     }
                 ],
                 BillingMode='PAY_PER_REQUEST'
@@ -96,42 +410,151 @@ class DynamoDBManager:
         except Exception as e:
             logger.error(f"Error creating table: {e}")
             return False
-    
+
+    def ensure_status_index(self):
+        """Add the status GSI to a pre-existing table and stamp rows
+        written before the index existed with their status key.
+
+        Users without a status attribute are invisible to the GSI, so
+        they would silently vanish from listings until backfilled."""
+        try:
+            description = _ddb_client().describe_table(TableName=self.table_name)
+            indexes = description['Table'].get('GlobalSecondaryIndexes', [])
+            if not any(gsi['IndexName'] == 'status-index' for gsi in indexes):
+                logger.info(f"Adding status-index to {self.table_name}")
+                _ddb_client().update_table(
+                    TableName=self.table_name,
+                    AttributeDefinitions=[
+                        {'AttributeName': 'status', 'AttributeType': 'S'},
+                        {'AttributeName': 'created_at', 'AttributeType': 'S'}
+                    ],
+                    GlobalSecondaryIndexUpdates=[
+                        {
+                            'Create': {
+                                'IndexName': 'status-index',
+                                'KeySchema': [
+                                    {'AttributeName': 'status', 'KeyType': 'HASH'},
+                                    {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
+                                ],
+                                'Projection': {'ProjectionType': 'ALL'}
+                            }
+                        }
+                    ]
+                )
+            self._backfill_status()
+            return True
+        except Exception as e:
+            logger.error(f"Error ensuring status index: {e}")
+            return False
+
+    def _backfill_status(self):
+        """Stamp rows that predate the status attribute with their GSI key"""
+        scan_kwargs = {
+            'FilterExpression': Attr('status').not_exists(),
+            'ProjectionExpression': 'user_id, active'
+        }
+        backfilled = 0
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                user_id = item['user_id']
+                state = 'active' if item.get('active', True) else 'inactive'
+                try:
+                    self._update_item(
+                        Key={'user_id': user_id},
+                        UpdateExpression="SET #st = :status",
+                        ExpressionAttributeNames={'#st': 'status'},
+                        ExpressionAttributeValues={
+                            ':status': f"{state}#{_shard(user_id)}"
+                        },
+                        # Racing writers may have stamped it already
+                        ConditionExpression=Attr('status').not_exists()
+                    )
+                    backfilled += 1
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                        raise
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        if backfilled:
+            logger.info(f"Backfilled status on {backfilled} users")
+
     def hash_password(self, password):
-        """Hash password using SHA256"""
-        return hashlib.sha256(password.encode('utf-8')).hexdigest()
+        """Hash password with scrypt (salted, memory-hard)"""
+        salt = os.urandom(16)
+        derived = hashlib.scrypt(password.encode('utf-8'), salt=salt,
+                                 n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=32)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${derived.hex()}"
+
+    def verify_password(self, password, stored_hash):
+        """Check a password against a stored scrypt (or legacy SHA256) hash"""
+        if not stored_hash:
+            return False
+
+        if stored_hash.startswith('scrypt$'):
+            try:
+                _, n, r, p, salt_hex, derived_hex = stored_hash.split('$')
+                derived = hashlib.scrypt(password.encode('utf-8'),
+                                         salt=bytes.fromhex(salt_hex),
+                                         n=int(n), r=int(r), p=int(p),
+                                         dklen=len(derived_hex) // 2)
+                return hmac.compare_digest(derived.hex(), derived_hex)
+            except (ValueError, TypeError):
+                return False
+
+        # Legacy unsalted SHA256; kept so existing accounts still verify
+        # and get rehashed on their next login
+        legacy = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return hmac.compare_digest(legacy, stored_hash)
+
+    def check_needs_rehash(self, stored_hash):
+        """True if the stored hash predates the current scrypt parameters"""
+        return not stored_hash.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+    def _cache_key(self, email, password):
+        """Deterministic credential-cache key (scrypt hashes are salted,
+        so the stored hash can't serve as a key); the SHA256 here is only
+        a cache fingerprint, never persisted"""
+        fingerprint = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return (email, fingerprint)
     
+    def _build_user_item(self, username, email, password, additional_data=None):
+        """Build a new user item with defaults and hashed password"""
+        timestamp = datetime.utcnow().isoformat()
+        user_id = str(uuid.uuid4())
+        return {
+            'user_id': user_id,
+            'username': username,
+            'email': email,  # normalized at the HTTP boundary
+            'password_hash': self.hash_password(password),
+            'created_at': timestamp,
+            'updated_at': timestamp,
+            'verified': False,
+            'active': True,
+            'status': f"active#{_shard(user_id)}",  # sharded GSI key mirroring the active flag
+            'login_count': 0,
+            'last_login': None,
+            'profile_data': additional_data or {}
+        }
+
     def insert_user(self, username, email, password, additional_data=None):
         """Insert new user into DynamoDB"""
         try:
             if not self.table:
                 raise Exception("Table not initialized")
-            
+
             # Check if email already exists
             if self.get_user_by_email(email):
                 return None, "Email already exists"
-            
-            user_id = str(uuid.uuid4())
-            timestamp = datetime.utcnow().isoformat()
-            
-            user_item = {
-                'user_id': user_id,
-                'username': username,
-                'email': email.lower(),  # Store email in lowercase
-                'password_hash': self.hash_password(password),
-                'created_at': timestamp,
-                'updated_at': timestamp,
-                'verified': False,
-                'active': True,
-                'login_count': 0,
-                'last_login': None,
-                'profile_data': additional_data or {}
-            }
-            
+
+            user_item = self._build_user_item(username, email, password, additional_data)
+            user_id = user_item['user_id']
+
             # Insert user
-            response = self.table.put_item(
+            response = self._put_item(
                 Item=user_item,
-                ConditionExpression=Attr('email').not_exists()  # Ensure email uniqueness
+                ConditionExpression=EMAIL_NOT_EXISTS  # Ensure email uniqueness
             )
             
             logger.info(f"User created: {user_id}")
@@ -140,27 +563,134 @@ class DynamoDBManager:
             user_item.pop('password_hash')
             return user_item, None
             
-        except dynamodb_client.exceptions.ConditionalCheckFailedException:
+        except _ddb_client().exceptions.ConditionalCheckFailedException:
             return None, "Email already exists"
         except Exception as e:
             logger.error(f"Error inserting user: {e}")
             return None, str(e)
-    
+
+    def batch_put_items(self, items):
+        """Write items in bulk (batch_writer chunks into <=25 writes and
+        retries unprocessed items automatically)"""
+        try:
+            if not self.table:
+                raise Exception("Table not initialized")
+
+            with self.table.batch_writer(overwrite_by_pkeys=['user_id']) as batch:
+                for item in items:
+                    batch.put_item(Item=item)
+
+            return len(items), None
+
+        except Exception as e:
+            logger.error(f"Error batch writing items: {e}")
+            return None, str(e)
+
+    def insert_users_bulk(self, entries):
+        """Create many users at once, enforcing the same email-uniqueness
+        rule as insert_user across the payload and existing rows"""
+        try:
+            if not self.table:
+                raise Exception("Table not initialized")
+
+            seen_emails = set()
+            for entry in entries:
+                email = entry['email']
+                if email in seen_emails:
+                    return None, f"Duplicate email in payload: {email}"
+                seen_emails.add(email)
+
+            for email in seen_emails:
+                if self.get_user_by_email(email):
+                    return None, f"Email already exists: {email}"
+
+            items = [self._build_user_item(entry['username'], entry['email'],
+                                           entry['password'],
+                                           entry.get('profile_data'))
+                     for entry in entries]
+
+            _, error = self.batch_put_items(items)
+            if error:
+                return None, error
+
+            # Return the created users without password hashes
+            for item in items:
+                item.pop('password_hash')
+
+            return items, None
+
+        except Exception as e:
+            logger.error(f"Error bulk inserting users: {e}")
+            return None, str(e)
+
+    # Mirrors retry_on_throttle's attempt budget for UnprocessedKeys
+    BATCH_GET_MAX_TRIES = 6
+
+    def batch_get_items(self, user_ids):
+        """Fetch items in bulk, <=100 keys per request, retrying
+        UnprocessedKeys with jittered exponential backoff"""
+        try:
+            if not self.table:
+                raise Exception("Table not initialized")
+
+            items = []
+            for start in range(0, len(user_ids), 100):
+                chunk = user_ids[start:start + 100]
+                request_items = {
+                    self.table_name: {
+                        'Keys': [{'user_id': uid} for uid in chunk],
+                        'ProjectionExpression': PUBLIC_FIELDS,
+                        'ExpressionAttributeNames': PUBLIC_FIELD_NAMES
+                    }
+                }
+
+                attempt = 0
+                while request_items:
+                    response = _ddb_resource().batch_get_item(RequestItems=request_items)
+                    items.extend(response.get('Responses', {}).get(self.table_name, []))
+
+                    request_items = response.get('UnprocessedKeys') or {}
+                    if request_items:
+                        attempt += 1
+                        if attempt >= self.BATCH_GET_MAX_TRIES:
+                            logger.error(
+                                f"Unprocessed keys remain after "
+                                f"{self.BATCH_GET_MAX_TRIES} batch_get_item attempts")
+                            return None, "Batch read incomplete: table throttled"
+                        time.sleep(min(2 ** attempt, 8) * random.uniform(0.5, 1.0) * 0.1)
+
+            return [_to_native(item) for item in items], None
+
+        except Exception as e:
+            logger.error(f"Error batch getting items: {e}")
+            return None, str(e)
+
     def get_user_by_id(self, user_id):
-        """Retrieve user by user_id"""
+        """Retrieve user by user_id (cached for repeat profile reads)"""
         try:
             if not self.table:
                 raise Exception("Table not initialized")
-            
-            response = self.table.get_item(
-                Key={'user_id': user_id}
+
+            cached = self._user_cache.get(user_id)
+            if cached is not None:
+                return dict(cached)
+
+            # Low-level client: skips the resource layer's per-attribute
+            # marshalling/Decimal wrapping on this hot single-item read
+            response = _ddb_client().get_item(
+                TableName=self.table_name,
+                Key={'user_id': {'S': user_id}},
+                ProjectionExpression=PUBLIC_FIELDS,
+                ExpressionAttributeNames=PUBLIC_FIELD_NAMES
             )
-            
+
             if 'Item' in response:
-                user = response['Item']
-                user.pop('password_hash', None)  # Remove password hash
+                user = _deserialize_item(response['Item'])
+                self._user_cache.set(user_id, dict(user))
+                if user.get('email'):
+                    self._email_to_uid.set(user['email'], user_id)
                 return user
-            
+
             return None
             
         except Exception as e:
@@ -168,19 +698,22 @@ class DynamoDBManager:
             return None
     
     def get_user_by_email(self, email):
-        """Retrieve user by email using GSI"""
+        """Retrieve user by (normalized) email using GSI"""
         try:
             if not self.table:
                 raise Exception("Table not initialized")
             
-            response = self.table.query(
+            response = _ddb_client().query(
+                TableName=self.table_name,
                 IndexName='email-index',
-                KeyConditionExpression=Key('email').eq(email.lower())
+                KeyConditionExpression='email = :email',
+                ExpressionAttributeValues={':email': {'S': email}}
             )
-            
-            if response['Items']:
-                return response['Items'][0]
-            
+
+            items = response.get('Items', [])
+            if items:
+                return _deserialize_item(items[0])
+
             return None
             
         except Exception as e:
@@ -188,47 +721,120 @@ class DynamoDBManager:
             return None
     
     def authenticate_user(self, email, password):
-        """Authenticate user and update login stats"""
+        """Authenticate user; login stats are updated asynchronously"""
         try:
-            user = self.get_user_by_email(email)
-            
-            if not user:
-                return None, "User not found"
-            
-            if not user.get('active', True):
-                return None, "Account deactivated"
-            
-            # Check password
-            if user['password_hash'] != self.hash_password(password):
-                return None, "Invalid password"
-            
-            # Update login statistics
-            self.update_user_login_stats(user['user_id'])
-            
-            # Remove password hash and return user
-            user.pop('password_hash', None)
+            cache_key = self._cache_key(email, password)
+            cached = self._auth_cache.get(cache_key)
+            rehash = None
+
+            if cached is not None:
+                # Credentials already verified recently; skip the GSI query
+                user = dict(cached)
+            else:
+                user = self.get_user_by_email(email)
+
+                if not user:
+                    return None, "User not found"
+
+                if not user.get('active', True):
+                    return None, "Account deactivated"
+
+                if not self.verify_password(password, user['password_hash']):
+                    return None, "Invalid password"
+
+                if self.check_needs_rehash(user['password_hash']):
+                    rehash = self.hash_password(password)
+
+                user.pop('password_hash', None)
+                self._auth_cache.set(cache_key, dict(user))
+
+            # Stats (and any pending hash upgrade) are flushed by the
+            # background worker; login counters tolerate bounded staleness
+            self.update_user_login_stats(user['user_id'], rehash)
             return user, None
-            
         except Exception as e:
             logger.error(f"Authentication error: {e}")
             return None, str(e)
+
+    def invalidate(self, email):
+        """Drop cached state for an email (on password change/delete)"""
+        if not email:
+            return
+        self._auth_cache.pop_matching(lambda key: key[0] == email)
+        user_id = self._email_to_uid.pop(email)
+        if user_id is not None:
+            self._user_cache.pop(user_id)
+
+    def invalidate_all(self):
+        """Flush every in-process cache (admin escape hatch)"""
+        self._auth_cache.clear()
+        self._user_cache.clear()
+        self._email_to_uid.clear()
     
-    def update_user_login_stats(self, user_id):
-        """Update user login statistics"""
-        try:
-            current_time = datetime.utcnow().isoformat()
-            
-            self.table.update_item(
-                Key={'user_id': user_id},
-                UpdateExpression="SET last_login = :time, login_count = login_count + :inc, updated_at = :time",
-                ExpressionAttributeValues={
-                    ':time': current_time,
-                    ':inc': 1
-                }
-            )
-            
-        except Exception as e:
-            logger.error(f"Error updating login stats: {e}")
+    # Drain up to 25 queued login-stat entries or wait at most 250ms,
+    # whichever comes first
+    LOGIN_FLUSH_MAX_ITEMS = 25
+    LOGIN_FLUSH_MAX_WAIT = 0.25
+
+    def update_user_login_stats(self, user_id, rehash=None):
+        """Queue a login-stat update for the background flusher"""
+        self._ensure_login_worker()
+        self._login_queue.put((user_id, _now_iso(), rehash))
+
+    def _ensure_login_worker(self):
+        """Start the drain thread on first use"""
+        if self._login_worker_started:
+            return
+        with self._login_worker_lock:
+            if not self._login_worker_started:
+                threading.Thread(target=self._drain_login_stats, daemon=True).start()
+                self._login_worker_started = True
+
+    def _drain_login_stats(self):
+        while True:
+            entries = [self._login_queue.get()]
+            deadline = time.monotonic() + self.LOGIN_FLUSH_MAX_WAIT
+            while len(entries) < self.LOGIN_FLUSH_MAX_ITEMS:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entries.append(self._login_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._flush_login_stats(entries)
+
+    def _flush_login_stats(self, entries):
+        """Write queued login stats, coalescing repeat logins per user"""
+        merged = {}
+        for user_id, timestamp, rehash in entries:
+            count, _, pending_rehash = merged.get(user_id, (0, None, None))
+            merged[user_id] = (count + 1, timestamp, rehash or pending_rehash)
+
+        for user_id, (count, timestamp, rehash) in merged.items():
+            try:
+                update_expression = "ADD login_count :inc SET last_login = :time, updated_at = :time"
+                expression_values = {':inc': count, ':time': timestamp}
+                if rehash:
+                    update_expression += ", password_hash = :rehash"
+                    expression_values[':rehash'] = rehash
+
+                self._hot_writes.record(user_id)
+                self._update_item(
+                    Key={'user_id': user_id},
+                    UpdateExpression=update_expression,
+                    # Guard against users deactivated (or deleted) between
+                    # enqueue and flush
+                    ConditionExpression=USER_ID_EXISTS & ACTIVE_TRUE,
+                    ExpressionAttributeValues=expression_values
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    logger.info(f"Dropping login stats for inactive user {user_id}")
+                else:
+                    logger.error(f"Error flushing login stats for {user_id}: {e}")
+            except Exception as e:
+                logger.error(f"Error flushing login stats for {user_id}: {e}")
     
     def update_user(self, user_id, update_data):
         """Update user data"""
@@ -236,46 +842,62 @@ class DynamoDBManager:
             if not self.table:
                 raise Exception("Table not initialized")
             
-            # Don't allow updating sensitive fields
-            forbidden_fields = ['user_id', 'password_hash', 'created_at']
+            # Don't allow updating sensitive fields; status is derived
+            # from active, never client-supplied
+            forbidden_fields = ['user_id', 'password_hash', 'created_at', 'status']
             update_data = {k: v for k, v in update_data.items() if k not in forbidden_fields}
-            
+
             if not update_data:
                 return None, "No valid fields to update"
+
+            # Keep the (sharded) status GSI key in sync with the active flag
+            if 'active' in update_data:
+                state = 'active' if update_data['active'] else 'inactive'
+                update_data['status'] = f"{state}#{_shard(user_id)}"
             
             # Add updated timestamp
-            update_data['updated_at'] = datetime.utcnow().isoformat()
-            
-            # Build update expression
-            update_expression = "SET "
-            expression_attribute_values = {}
-            expression_attribute_names = {}
-            
-            for key, value in update_data.items():
-                # Handle reserved keywords
-                attr_name = f"#{key}"
-                attr_value = f":{key}"
-                
-                update_expression += f"{attr_name} = {attr_value}, "
-                expression_attribute_names[attr_name] = key
-                expression_attribute_values[attr_value] = value
+            update_data['updated_at'] = _now_iso()
+
+            # An email change must also evict cache entries keyed by the
+            # old address, so capture it before the write
+            old_email = None
+            if 'email' in update_data:
+                previous = self._user_cache.get(user_id) or self.get_user_by_id(user_id)
+                if previous:
+                    old_email = previous.get('email')
             
-            update_expression = update_expression.rstrip(', ')
+            # Cached expression template per field set (placeholders also
+            # cover reserved keywords); only values are built per call
+            update_expression, expression_attribute_names = _update_template(
+                tuple(sorted(update_data)))
+            expression_attribute_values = {f":{key}": value
+                                           for key, value in update_data.items()}
             
-            response = self.table.update_item(
+            response = self._update_item(
                 Key={'user_id': user_id},
                 UpdateExpression=update_expression,
                 ExpressionAttributeNames=expression_attribute_names,
                 ExpressionAttributeValues=expression_attribute_values,
                 ReturnValues="ALL_NEW",
-                ConditionExpression=Attr('user_id').exists()
+                ConditionExpression=USER_ID_EXISTS
             )
             
-            user = response['Attributes']
+            user = _to_native(response['Attributes'])
             user.pop('password_hash', None)
+
+            # Drop credentials cached for the old and new emails
+            # (deactivation, email change), then write the fresh doc
+            # through to the profile cache
+            if old_email and old_email != user.get('email'):
+                self.invalidate(old_email)
+            self.invalidate(user.get('email'))
+            self._user_cache.set(user_id, dict(user))
+            if user.get('email'):
+                self._email_to_uid.set(user['email'], user_id)
+
             return user, None
             
-        except dynamodb_client.exceptions.ConditionalCheckFailedException:
+        except _ddb_client().exceptions.ConditionalCheckFailedException:
             return None, "User not found"
         except Exception as e:
             logger.error(f"Error updating user: {e}")
@@ -295,25 +917,77 @@ class DynamoDBManager:
             logger.error(f"Error deleting user: {e}")
             return False, str(e)
     
+    def iter_users(self, status='active'):
+        """Yield users page by page via Query on the status GSI,
+        fanning out over the write shards.
+
+        Falls back to a filtered Scan when the GSI is absent (tables
+        that predate it and haven't run ensure_status_index yet)."""
+        yielded = False
+        try:
+            for user in self._iter_users_indexed(status):
+                yielded = True
+                yield user
+        except ClientError as e:
+            code = e.response['Error']['Code']
+            if yielded or code not in ('ResourceNotFoundException',
+                                       'ValidationException'):
+                raise
+            logger.warning(f"status-index unavailable ({code}); "
+                           "falling back to scan")
+            for user in self._iter_users_scan(status):
+                yield user
+
+    def _iter_users_indexed(self, status):
+        paginator = _ddb_client().get_paginator('query')
+
+        for shard in range(STATUS_SHARDS):
+            pages = paginator.paginate(
+                TableName=self.table_name,
+                IndexName='status-index',
+                KeyConditionExpression='#st = :status',
+                ProjectionExpression=PUBLIC_FIELDS,
+                ExpressionAttributeNames=PUBLIC_FIELD_NAMES,
+                ExpressionAttributeValues={':status': {'S': f"{status}#{shard}"}}
+            )
+
+            for page in pages:
+                for raw_item in page.get('Items', []):
+                    yield _deserialize_item(raw_item)
+
+    def _iter_users_scan(self, status):
+        scan_kwargs = {
+            'FilterExpression': ACTIVE_TRUE if status == 'active'
+                                else Attr('active').eq(False),
+            'ProjectionExpression': PUBLIC_FIELDS,
+            'ExpressionAttributeNames': PUBLIC_FIELD_NAMES
+        }
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                yield _to_native(item)
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
     def get_all_users(self, active_only=True):
-        """Get all users (use with caution for large datasets)"""
+        """Get all users (paginated Query on the status GSI, not a Scan)"""
         try:
             if not self.table:
                 raise Exception("Table not initialized")
-            
-            scan_kwargs = {}
+
             if active_only:
-                scan_kwargs['FilterExpression'] = Attr('active').eq(True)
-            
-            response = self.table.scan(**scan_kwargs)
-            users = response.get('Items', [])
-            
-            # Remove password hashes
-            for user in users:
-                user.pop('password_hash', None)
-            
+                return list(self.iter_users('active')), None
+
+            # No single status value covers everyone; fall back to a scan
+            response = self.table.scan(
+                ProjectionExpression=PUBLIC_FIELDS,
+                ExpressionAttributeNames=PUBLIC_FIELD_NAMES
+            )
+            users = [_to_native(user) for user in response.get('Items', [])]
+
             return users, None
-            
+
         except Exception as e:
             logger.error(f"Error getting all users: {e}")
             return None, str(e)
@@ -324,7 +998,7 @@ class DynamoDBManager:
             if not self.table:
                 return None, "Table not initialized"
             
-            response = dynamodb_client.describe_table(TableName=self.table_name)
+            response = _ddb_client().describe_table(TableName=self.table_name)
             table_info = response['Table']
             
             stats = {
@@ -345,14 +1019,29 @@ class DynamoDBManager:
 # Initialize database manager
 db_manager = DynamoDBManager(TABLE_NAME)
 
+def _dump_json(payload):
+    """Serialize to JSON bytes, preferring orjson (C extension, several
+    times faster than stdlib json on list-heavy payloads)"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str)
+    return json.dumps(payload, default=str).encode('utf-8')
+
+def json_response(payload, status=200):
+    """Build a JSON response; Decimal and datetime fall back to str"""
+    return app.response_class(
+        _dump_json(payload),
+        status=status,
+        mimetype='application/json'
+    )
+
 # API Routes
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return json_response({
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "table_connected": db_manager.table is not None
+        "timestamp": _now_iso(),
+        "table_connected": db_manager.ping()
     })
 
 @app.route('/setup', methods=['POST'])
@@ -360,17 +1049,17 @@ def setup_database():
     """Initialize database table"""
     success = db_manager.create_table()
     if success:
-        return jsonify({"message": "Database setup complete", "table_name": TABLE_NAME})
+        return json_response({"message": "Database setup complete", "table_name": TABLE_NAME})
     else:
-        return jsonify({"error": "Failed to setup database"}), 500
+        return json_response({"error": "Failed to setup database"}, 500)
 
 @app.route('/stats', methods=['GET'])
 def get_stats():
     """Get database statistics"""
     stats, error = db_manager.get_table_stats()
     if error:
-        return jsonify({"error": error}), 500
-    return jsonify({"stats": stats})
+        return json_response({"error": error}, 500)
+    return json_response({"stats": stats})
 
 @app.route('/users', methods=['POST'])
 def create_user():
@@ -383,17 +1072,76 @@ def create_user():
         additional_data = data.get('profile_data', {})
         
         if not all([username, email, password]):
-            return jsonify({"error": "Missing required fields: username, email, password"}), 400
-        
+            return json_response({"error": "Missing required fields: username, email, password"}, 400)
+
+        email = normalize_email(email)
+        if not email:
+            return json_response({"error": "Invalid email address"}, 400)
+
         user, error = db_manager.insert_user(username, email, password, additional_data)
         if error:
-            return jsonify({"error": error}), 400
+            return json_response({"error": error}, 400)
         
-        return jsonify({"user": user, "message": "User created successfully"}), 201
+        return json_response({"user": user, "message": "User created successfully"}, 201)
         
     except Exception as e:
         logger.error(f"Error in create_user: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        return json_response({"error": "Internal server error"}, 500)
+
+@app.route('/users/batch', methods=['POST'])
+def create_users_batch():
+    """Create multiple users in one call using batched writes"""
+    try:
+        data = request.json
+        users = data.get('users', [])
+
+        if not users:
+            return json_response({"error": "No users provided"}, 400)
+
+        entries = []
+        for entry in users:
+            username = entry.get('username')
+            email = normalize_email(entry.get('email'))
+            password = entry.get('password')
+            if not all([username, email, password]):
+                return json_response({"error": "Each user needs username, email, password"}, 400)
+            entries.append({'username': username, 'email': email,
+                            'password': password,
+                            'profile_data': entry.get('profile_data', {})})
+
+        created, error = db_manager.insert_users_bulk(entries)
+        if error:
+            return json_response({"error": error}, 400)
+
+        return json_response({
+            "message": f"{len(created)} users created",
+            "user_ids": [user['user_id'] for user in created],
+            "count": len(created)
+        }, 201)
+
+    except Exception as e:
+        logger.error(f"Error in create_users_batch: {e}")
+        return json_response({"error": "Internal server error"}, 500)
+
+@app.route('/users/batch-get', methods=['POST'])
+def get_users_batch():
+    """Fetch multiple users by id in one call using batched reads"""
+    try:
+        data = request.json
+        user_ids = data.get('user_ids', [])
+
+        if not user_ids:
+            return json_response({"error": "No user_ids provided"}, 400)
+
+        users, error = db_manager.batch_get_items(user_ids)
+        if error:
+            return json_response({"error": error}, 500)
+
+        return json_response({"users": users, "count": len(users)})
+
+    except Exception as e:
+        logger.error(f"Error in get_users_batch: {e}")
+        return json_response({"error": "Internal server error"}, 500)
 
 @app.route('/users/authenticate', methods=['POST'])
 def authenticate():
@@ -404,17 +1152,21 @@ def authenticate():
         password = data.get('password')
         
         if not all([email, password]):
-            return jsonify({"error": "Email and password required"}), 400
-        
+            return json_response({"error": "Email and password required"}, 400)
+
+        email = normalize_email(email)
+        if not email:
+            return json_response({"error": "Invalid email address"}, 400)
+
         user, error = db_manager.authenticate_user(email, password)
         if error:
-            return jsonify({"error": error}), 401
+            return json_response({"error": error}, 401)
         
-        return jsonify({"user": user, "message": "Authentication successful"})
+        return json_response({"user": user, "message": "Authentication successful"})
         
     except Exception as e:
         logger.error(f"Error in authenticate: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        return json_response({"error": "Internal server error"}, 500)
 
 @app.route('/users/<user_id>', methods=['GET'])
 def get_user(user_id):
@@ -422,28 +1174,35 @@ def get_user(user_id):
     try:
         user = db_manager.get_user_by_id(user_id)
         if user:
-            return jsonify({"user": user})
+            return json_response({"user": user})
         else:
-            return jsonify({"error": "User not found"}), 404
+            return json_response({"error": "User not found"}, 404)
             
     except Exception as e:
         logger.error(f"Error in get_user: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        return json_response({"error": "Internal server error"}, 500)
 
 @app.route('/users/<user_id>', methods=['PUT'])
 def update_user(user_id):
     """Update user"""
     try:
         data = request.json
+
+        if 'email' in data:
+            email = normalize_email(data['email'])
+            if not email:
+                return json_response({"error": "Invalid email address"}, 400)
+            data['email'] = email
+
         user, error = db_manager.update_user(user_id, data)
         if error:
-            return jsonify({"error": error}), 400
+            return json_response({"error": error}, 400)
         
-        return jsonify({"user": user, "message": "User updated successfully"})
+        return json_response({"user": user, "message": "User updated successfully"})
         
     except Exception as e:
         logger.error(f"Error in update_user: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        return json_response({"error": "Internal server error"}, 500)
 
 @app.route('/users/<user_id>', methods=['DELETE'])
 def delete_user(user_id):
@@ -451,27 +1210,53 @@ def delete_user(user_id):
     try:
         success, error = db_manager.delete_user(user_id)
         if error:
-            return jsonify({"error": error}), 400
+            return json_response({"error": error}, 400)
         
-        return jsonify({"message": "User deactivated successfully"})
+        return json_response({"message": "User deactivated successfully"})
         
     except Exception as e:
         logger.error(f"Error in delete_user: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        return json_response({"error": "Internal server error"}, 500)
 
 @app.route('/users', methods=['GET'])
 def list_users():
-    """List all active users"""
+    """List all active users, streamed page by page"""
+    users = db_manager.iter_users('active')
+
+    # Pull the first user before committing to a 200 so setup problems
+    # (missing index, unreachable table) still surface as a 500
     try:
-        users, error = db_manager.get_all_users()
-        if error:
-            return jsonify({"error": error}), 500
-        
-        return jsonify({"users": users, "count": len(users)})
-        
+        first = next(users, None)
     except Exception as e:
         logger.error(f"Error in list_users: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        return json_response({"error": "Internal server error"}, 500)
+
+    def generate():
+        # First bytes go out after the first DynamoDB page instead of
+        # after the whole result set is materialized in memory
+        yield b'{"users":['
+        count = 0
+        try:
+            if first is not None:
+                yield _dump_json(first)
+                count = 1
+                for user in users:
+                    yield b','
+                    yield _dump_json(user)
+                    count += 1
+        except Exception as e:
+            # Status is already on the wire; close the JSON cleanly so
+            # the client at least gets a parseable partial document
+            logger.error(f"Error streaming users: {e}")
+        yield b'],"count":%d}' % count
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Local/dev convenience only. In production serve with a worker that
+    # sets up concurrency before this module is imported, e.g.:
+    #   gunicorn -k gevent -w 4 --worker-connections 256 dynamodb.client:app
+    # (gevent must monkey-patch before boto3 pulls in ssl/socket, so an
+    # in-process patch here would be too late)
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true')
+    app.run(debug=debug, host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file